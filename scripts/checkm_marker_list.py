@@ -23,12 +23,8 @@ def main():
             continue
         line = line.rstrip().split('\t')[5]
         break
-    mss = re.findall(r'{.*?}', line)
-    res = []
-    for ms in mss:
-        res.extend(ms[1:-1].replace("'", '').split(', '))
-    for key in sorted(set(res)):
-        print(key)
+    res = sorted(set(re.findall(r"'([^']+)'", line)))
+    sys.stdout.write(''.join(x + '\n' for x in res))
 
 
 if __name__ == "__main__":
@@ -12,7 +12,8 @@ Note:
 import sys
 import fileinput
 import json
-from collections import Counter
+from ast import literal_eval
+from collections import defaultdict, Counter
 
 
 def main():
@@ -22,16 +23,18 @@ def main():
     for line in fileinput.input():
         if line.startswith('#'):
             continue
-        line = line.rstrip().split('\t')[-1]
+        line = line[line.rfind('\t') + 1:].rstrip()
         break
-    res = {}
-    for orf, markers in json.loads(line.replace("'", '"')).items():
-        contig = orf.rpartition('_')[0]
-        for marker in markers.keys():
-            res.setdefault(contig, []).append(marker)
+    try:
+        data = json.loads(line.replace("'", '"'))
+    except ValueError:
+        data = literal_eval(line)
+    res = defaultdict(Counter)
+    for orf, markers in data.items():
+        res[orf.rpartition('_')[0]].update(markers.keys())
     for contig, markers in sorted(res.items()):
         row = []
-        for marker, count in sorted(Counter(markers).items()):
+        for marker, count in sorted(markers.items()):
             row.append(marker if count == 1 else f'{marker}:{count}')
         print(contig, ','.join(row), sep='\t')
 
@@ -13,17 +13,44 @@ Notes:
     The output is a tab-separated table with rows as sequence identifiers and
     columns as all possible k-mers (including unobserved ones).
 
+    With "--canonical", only canonical k-mers (the lexicographically smaller
+    one of each k-mer and its reverse complement) are reported. Since both
+    strands are considered, the frequencies are identical to those of the
+    same columns in the full table, while the table is about half as wide.
+
+    With "--sparse", the output is instead a mapping of sequence identifiers
+    to observed k-mers and their frequencies (e.g., "AAC:3,ACG,CCG:2", where
+    frequency 1 is omitted), without a header. Sequences without any valid
+    k-mer are omitted. This is much smaller than the full table when many
+    k-mers are not observed, which is the case for short sequences or big
+    k's.
+
     Note: This k-mer counter is optimized for small k-values (k = 4, 5, 6...)
     and many sequences, which are typical for the task of contig binning. It
     is not efficient for large k-values (e.g., k = 35).
 
     Note: The output file may be large, especially for relatively big k's.
     One may consider piping the output to a downstream application.
+
+    It requires the Python library NumPy. If the Python library Numba is
+    available, k-mer counting will be accelerated by just-in-time compilation.
+    In addition, with "--threads" more than one, an input file (not stdin)
+    will be memory-mapped and sequences will be processed in parallel.
 """
 
 import sys
+import mmap
 import argparse
-import unittest
+
+try:
+    import numpy as np
+except ModuleNotFoundError:
+    exit('This script requires Python library NumPy.')
+
+try:
+    from numba import njit, prange, config, set_num_threads
+except ImportError:
+    njit = None
 
 
 def parse_args():
@@ -32,13 +59,21 @@ def parse_args():
     parser = argparse.ArgumentParser(
         formatter_class=argparse.RawDescriptionHelpFormatter)
     arg = parser.add_argument
-    arg('-i', '--input', type=argparse.FileType('r'), default=sys.stdin,
+    arg('-i', '--input', type=argparse.FileType('rb'),
+        default=sys.stdin.buffer,
         help='input DNA sequences (multi-FASTA), default: stdin')
     arg('-k', '--kvalue', type=int, default=4,
         help='k-mer size, default: 4')
     arg('-l', '--minlen', type=int,
         help='minimum length threshold')
-    arg('-o', '--output', type=argparse.FileType('w'), default=sys.stdout,
+    arg('-c', '--canonical', action='store_true',
+        help='report canonical k-mers only')
+    arg('-s', '--sparse', action='store_true',
+        help='output observed k-mers only')
+    arg('-t', '--threads', type=int, default=1,
+        help='number of threads (requires Numba), default: 1')
+    arg('-o', '--output', type=argparse.FileType('wb'),
+        default=sys.stdout.buffer,
         help='output k-mer frequency table, default: stdout')
     for arg in parser._actions:
         arg.metavar = ''
@@ -61,33 +96,250 @@ def main():
     # valid bases
     chars = 'ACGT'
 
-    # function to get base index (forward and reverse)
-    # tobit = chars.index
-    tobit = chars.find
-
     # k-mer size
     k = args.kvalue
 
     # total number of kmers
     n = len(chars) ** k
 
-    # print header (all possible k-mers)
+    # all possible k-mers
     head = list_kmers(chars, k, n)
-    print('', '\t'.join(head), sep='\t', file=out)
+
+    # canonical k-mers
+    canon = args.canonical
+    cidx = None
+    if canon:
+        keep, cidx, pals = canonical_kmers(k, n)
+        head = [head[i] for i in keep]
+
+    # sparse output: observed k-mers and frequencies
+    if args.sparse:
+        kmers = [x.encode() for x in head]
+
+        def write(name, freqs):
+            row = format_sparse(name, freqs, kmers)
+            if row:
+                out.write(row)
+
+    # dense output: frequencies of all k-mers
+    else:
+        out.write(('\t' + '\t'.join(head) + '\n').encode())
+        fmt = b'%s' + b'\t%d' * len(head) + b'\n'
+
+        def write(name, freqs):
+            out.write(fmt % (name, *freqs.tolist()))
+
+    # base-to-bit lookup table
+    tbl = build_table(chars)
+
+    # process memory-mapped file in parallel
+    threads = args.threads
+    if threads > 1 and count_bytes is not None:
+        mm = map_file(args.input)
+        if mm is not None:
+            set_num_threads(min(threads, config.NUMBA_NUM_THREADS))
+            tbl = build_table(chars, skip=b' \t\r\n\x0b\x0c')
+            for name, res in count_mapped(mm, tbl, k, len(head), minlen, cidx):
+                if canon:
+                    res[pals] *= 2
+                write(name, res)
+            return
+
+    # k-mer frequencies (reused across sequences)
+    freqs = np.zeros(len(head), dtype=np.uint32)
+
+    # byte-to-bit translation table (if Numba is not available)
+    trans = tbl.tobytes()
 
     # extract k-mer frequencies
-    name, seq, freqs = '', '', None
-    for line in args.input:
-        if line[0] == '>':
-            if seq and len(seq) >= minlen:
-                freqs = count_kmers(seq, k, n, tobit)
-                print(name, '\t'.join(map(str, freqs)), sep='\t', file=out)
-            name, seq = line[1:].rstrip().split()[0], ''
+    for name, seq in read_fasta(args.input):
+        if not seq or len(seq) < minlen:
+            continue
+        if count_bytes is None:
+            res = count_kmers(seq.translate(trans), k, n)
+            freqs[:] = [res[i] for i in keep] if canon else res
+        else:
+            freqs.fill(0)
+            arr = np.frombuffer(seq, dtype=np.uint8)
+            if canon:
+                count_canonical(arr, tbl, k, cidx, freqs)
+                freqs[pals] *= 2
+            else:
+                count_bytes(arr, tbl, k, freqs)
+        write(name, freqs)
+
+
+def read_fasta(fh, size=1 << 20):
+    """Read sequences from a multi-FASTA file.
+
+    Parameters
+    ----------
+    fh : file handle
+        Input file opened in binary mode.
+    size : int, optional
+        Number of bytes to read at a time.
+
+    Yields
+    ------
+    bytes
+        Sequence name.
+    bytes
+        Sequence.
+
+    Notes
+    -----
+    The file is read in large chunks which are split into lines, avoiding
+    decoding the file into text.
+    """
+    name, lines, tail = b'', [], b''
+    while True:
+        chunk = fh.read(size)
+        if not chunk:
+            break
+        chunk = chunk.split(b'\n')
+        chunk[0] = tail + chunk[0]
+        tail = chunk.pop()
+        for line in chunk:
+            if line[:1] == b'>':
+                if lines:
+                    yield name, b''.join(lines)
+                name, lines = line[1:].split(None, 1)[0], []
+            else:
+                lines.append(line.rstrip())
+    if tail[:1] == b'>':
+        if lines:
+            yield name, b''.join(lines)
+        name, lines = tail[1:].split(None, 1)[0], []
+    elif tail:
+        lines.append(tail.rstrip())
+    if lines:
+        yield name, b''.join(lines)
+
+
+def map_file(fh):
+    """Memory-map an input file.
+
+    Parameters
+    ----------
+    fh : file handle
+        Input file.
+
+    Returns
+    -------
+    mmap.mmap or None
+        Read-only memory map of the file, or None if the file cannot be
+        mapped (e.g., a pipe or an empty file).
+    """
+    try:
+        return mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+
+def count_mapped(mm, tbl, k, ncol, minlen=0, cidx=None, batch=1024):
+    """Count k-mers of sequences in a memory-mapped multi-FASTA file.
+
+    Parameters
+    ----------
+    mm : mmap.mmap
+        Memory-mapped multi-FASTA file.
+    tbl : np.array
+        Byte-to-base lookup table, in which whitespaces are marked.
+    k : int
+        k-mer size.
+    ncol : int
+        Number of k-mers to report.
+    minlen : int, optional
+        Minimum length threshold.
+    cidx : np.array, optional
+        Position of each k-mer's canonical k-mer, if canonical.
+    batch : int, optional
+        Number of sequences to process at a time.
+
+    Yields
+    ------
+    bytes
+        Sequence name.
+    np.array
+        k-mer frequencies.
+
+    Notes
+    -----
+    Header lines are located by searching the file for line breaks followed
+    by ">", a batch at a time. Then each batch of sequences is counted in
+    parallel as zero-copy views of the file. The yielded frequencies are
+    views of a buffer which is reused by the next batch.
+
+    Sequence before the first header line (if any) is reported with an empty
+    name, as is done by `read_fasta`.
+    """
+    arr = np.frombuffer(mm, dtype=np.uint8)
+    size = arr.size
+
+    # frequencies and lengths of a batch of sequences
+    res = np.empty((batch, ncol), dtype=np.uint32)
+    lens = np.empty(batch, dtype=np.int64)
+
+    def count(names, starts, ends):
+        m = len(names)
+        starts, ends = np.array(starts), np.array(ends)
+        res[:m] = 0
+        if cidx is None:
+            count_batch(arr, starts, ends, tbl, k, minlen, res[:m], lens[:m])
         else:
-            seq += line.rstrip().upper()
-    if seq and len(seq) >= minlen:
-        freqs = count_kmers(seq, k, n, tobit)
-        print(name, '\t'.join(map(str, freqs)), sep='\t', file=out)
+            count_canonical_batch(
+                arr, starts, ends, tbl, k, cidx, minlen, res[:m], lens[:m])
+        return zip(names, res[:m], lens[:m])
+
+    # position of the first header line
+    head = 0 if mm[:1] == b'>' else mm.find(b'\n>') + 1 or size
+
+    # unnamed sequence before it
+    names, starts, ends = ([b''], [0], [head]) if head else ([], [], [])
+
+    while head < size:
+        eol = mm.find(b'\n', head)
+        if eol == -1:
+            eol = size
+        names.append(mm[head + 1:eol].split(None, 1)[0])
+        starts.append(eol)
+        head = mm.find(b'\n>', eol) + 1 or size
+        ends.append(head)
+        if len(names) == batch:
+            for name, freqs, L in count(names, starts, ends):
+                if L and L >= minlen:
+                    yield name, freqs
+            names, starts, ends = [], [], []
+    if names:
+        for name, freqs, L in count(names, starts, ends):
+            if L and L >= minlen:
+                yield name, freqs
+
+
+def format_sparse(name, freqs, kmers):
+    """Format an output row of observed k-mers and their frequencies.
+
+    Parameters
+    ----------
+    name : bytes
+        Sequence name.
+    freqs : np.array
+        k-mer frequencies.
+    kmers : list of bytes
+        k-mers corresponding to the frequencies.
+
+    Returns
+    -------
+    bytes or None
+        Output row (e.g., "name\tAAC:3,ACG,CCG:2\n", where frequency 1 is
+        omitted), or None if no k-mer is observed.
+    """
+    idx = np.flatnonzero(freqs)
+    if idx.size == 0:
+        return
+    row = [kmers[i] if x == 1 else b'%s:%d' % (kmers[i], x)
+           for i, x in zip(idx.tolist(), freqs[idx].tolist())]
+    return name + b'\t' + b','.join(row) + b'\n'
 
 
 def list_kmers(chars, k, n):
@@ -107,38 +359,41 @@ def list_kmers(chars, k, n):
     list of str
         All possible k-mers.
     """
-    res = [''] * n
-    for i in range(n):
-        idx, kmer = i, ''
-        for _ in range(k):
-            kmer = chars[idx & 4 - 1] + kmer
-            idx >>= 2
-        res[i] = kmer
-    return res
+    # base-4 digits of each k-mer index, most significant first
+    idx = np.arange(n, dtype=np.uint32)
+    shifts = np.arange(2 * (k - 1), -1, -2, dtype=np.uint32)
+    digits = (idx[:, None] >> shifts) & 3
+
+    # translate digits into characters and merge them into strings
+    bases = np.array([x.encode() for x in chars], dtype='S1')
+    return bases[digits].view(f'S{k}').ravel().astype(str).tolist()
 
 
-def count_kmers(seq, k, n, tobit):
+def count_kmers(seq, k, n):
     """Count k-mers.
 
     Parameters
     ----------
-    seq : str
-        DNA sequence.
+    seq : bytes
+        DNA sequence translated into base indices (> 3 for invalid
+        characters).
     k : int
         k-mer size.
     n : int
         Total number of k-mers.
-    tobit : callable
-        Convertor of character into bit.
 
     Returns
     -------
-    np.array
+    list of int
         k-mer frequencies.
 
     Notes
     -----
     This function uses bitwise operations to accelerate calculation.
+
+    The sequence is translated into base indices (see `build_table`) using
+    `bytes.translate`, which handles both cases in one pass. Iterating over
+    bytes yields integers directly.
     """
     # pre-allocate result
     res = [0] * n
@@ -151,10 +406,10 @@ def count_kmers(seq, k, n, tobit):
     x = (1 << q) - 1
 
     # count k-mers
-    for bit in map(tobit, seq):
+    for bit in seq:
 
         # invalid character
-        if bit == -1:
+        if bit > 3:
             fwd, rev, m = 0, 0, 0
 
         # current k-mer is complete, move to next k-mer
@@ -179,47 +434,274 @@ def count_kmers(seq, k, n, tobit):
     return res
 
 
-class Tests(unittest.TestCase):
-    def setUp(self):
-        self.chars = 'ACGT'
-
-    def test_list_kmers(self):
-        k = 2
-        n = len(self.chars) ** k
-        obs = list_kmers(self.chars, k, n)
-        exp = ['AA', 'AC', 'AG', 'AT',
-               'CA', 'CC', 'CG', 'CT',
-               'GA', 'GC', 'GG', 'GT',
-               'TA', 'TC', 'TG', 'TT']
-        self.assertListEqual(obs, exp)
-
-    def test_count_kmers(self):
-        tobit = self.chars.index
-
-        k = 2
-        n = len(self.chars) ** k
-        obs = count_kmers('ACGT', k, n, tobit)
-        exp = [0, 2, 0, 0,
-               0, 0, 2, 0,
-               0, 0, 0, 2,
-               0, 0, 0, 0]
-        self.assertListEqual(obs, exp)
-
-        obs = count_kmers('GCACTA', k, n, tobit)
-        exp = [0, 1, 1, 0,
-               1, 0, 0, 1,
-               0, 2, 0, 1,
-               2, 0, 1, 0]
-        self.assertListEqual(obs, exp)
-
-        k = 3
-        n = len(self.chars) ** k
-        obs = count_kmers('CCAGCTGCGTAACCGAGAAACTACGTCT', k, n, tobit)
-        exp = [1, 2, 0, 0, 0, 1, 3, 1, 2, 2, 0, 1, 0, 0, 0, 0,
-               0, 0, 2, 0, 1, 0, 1, 0, 1, 1, 1, 3, 1, 1, 2, 0,
-               1, 1, 1, 0, 1, 0, 1, 2, 0, 0, 0, 1, 2, 1, 0, 2,
-               1, 2, 1, 0, 0, 0, 1, 2, 0, 1, 1, 0, 1, 1, 0, 1]
-        self.assertListEqual(obs, exp)
+def canonical_kmers(k, n):
+    """Map k-mers to canonical k-mers.
+
+    Parameters
+    ----------
+    k : int
+        k-mer size.
+    n : int
+        Total number of k-mers.
+
+    Returns
+    -------
+    np.array
+        Indices of canonical k-mers.
+    np.array
+        Position of each k-mer's canonical k-mer in the former.
+    np.array
+        Positions of palindromic k-mers in the former.
+
+    Notes
+    -----
+    The reverse complement of a k-mer index is obtained by complementing
+    (3 - x) each base-4 digit and reversing the order of digits.
+    """
+    idx = np.arange(n, dtype=np.int64)
+    rc = np.zeros(n, dtype=np.int64)
+    for i in range(k):
+        rc = (rc << 2) + 3 - ((idx >> 2 * i) & 3)
+    keep = np.flatnonzero(idx <= rc)
+    cidx = np.searchsorted(keep, np.minimum(idx, rc))
+    pals = np.flatnonzero(rc[keep] == keep)
+    return keep, cidx, pals
+
+
+def build_table(chars, skip=b''):
+    """Build a lookup table of bytes to base indices.
+
+    Parameters
+    ----------
+    chars : str
+        All valid characters.
+    skip : bytes, optional
+        Whitespace characters to be skipped at the end of a line.
+
+    Returns
+    -------
+    np.array
+        Base index of each byte (255 for invalid characters, 254 for
+        whitespaces).
+
+    Notes
+    -----
+    Upper and lower cases are both mapped.
+    """
+    tbl = np.full(256, 255, dtype=np.uint8)
+    for c in skip:
+        tbl[c] = 254
+    for i, c in enumerate(chars):
+        tbl[ord(c.upper())] = tbl[ord(c.lower())] = i
+    return tbl
+
+
+def _count_bytes(seq, tbl, k, res):
+    """Count k-mers in a raw DNA sequence.
+
+    Parameters
+    ----------
+    seq : np.array
+        DNA sequence as bytes (uint8).
+    tbl : np.array
+        Byte-to-base lookup table.
+    k : int
+        k-mer size.
+    res : np.array
+        k-mer frequencies to be incremented.
+
+    Notes
+    -----
+    Same algorithm as `count_kmers`, to be compiled by Numba. Each byte is
+    looked up in the table as it is scanned, so the sequence is read only
+    once and no encoded copy is created. Indices are kept as native 64-bit
+    integers, such that only the two bits of each new base are shifted in.
+    The complement of a base is obtained by XOR 3.
+
+    Whitespaces marked in the table are skipped if they are followed by a
+    line break or the end of the sequence, as lines are stripped by
+    `read_fasta`. Otherwise they are invalid characters.
+    """
+    fwd, rev, m = 0, 0, 0
+    q = (k - 1) * 2
+    x = (1 << q) - 1
+    i, n = 0, seq.size
+    while i < n:
+        bit = np.int64(tbl[seq[i]])
+        if bit == 254:
+            # skip whitespaces up to a line break or the end
+            j = space_end(seq, tbl, i)
+            if j == n or seq[j] == 10:
+                i = j + 1
+                continue
+            # otherwise they are invalid characters
+            i, bit = j - 1, 255
+        if bit == 255:
+            fwd, rev, m = 0, 0, 0
+        elif m == k:
+            fwd = ((fwd & x) << 2) + bit
+            rev = (rev >> 2) + ((bit ^ 3) << q)
+            res[fwd] += 1
+            res[rev] += 1
+        else:
+            fwd = bit + (fwd << 2)
+            rev += (bit ^ 3) << 2 * m
+            m += 1
+            if m == k:
+                res[fwd] += 1
+                res[rev] += 1
+        i += 1
+
+
+def _count_canonical(seq, tbl, k, cidx, res):
+    """Count canonical k-mers in a raw DNA sequence.
+
+    Parameters
+    ----------
+    seq : np.array
+        DNA sequence as bytes (uint8).
+    tbl : np.array
+        Byte-to-base lookup table.
+    k : int
+        k-mer size.
+    cidx : np.array
+        Position of each k-mer's canonical k-mer in the result.
+    res : np.array
+        Canonical k-mer frequencies to be incremented.
+
+    Notes
+    -----
+    Only the forward index is tracked, and one count is added per position.
+    Counts of palindromic k-mers need to be doubled afterwards to match the
+    two-strand counts of `count_kmers`. Whitespaces are handled as in
+    `_count_bytes`.
+    """
+    fwd, m = 0, 0
+    x = (1 << (k - 1) * 2) - 1
+    i, n = 0, seq.size
+    while i < n:
+        bit = np.int64(tbl[seq[i]])
+        if bit == 254:
+            # skip whitespaces up to a line break or the end
+            j = space_end(seq, tbl, i)
+            if j == n or seq[j] == 10:
+                i = j + 1
+                continue
+            # otherwise they are invalid characters
+            i, bit = j - 1, 255
+        if bit == 255:
+            fwd, m = 0, 0
+        elif m == k:
+            fwd = ((fwd & x) << 2) + bit
+            res[cidx[fwd]] += 1
+        else:
+            fwd = bit + (fwd << 2)
+            m += 1
+            if m == k:
+                res[cidx[fwd]] += 1
+        i += 1
+
+
+def _space_end(seq, tbl, i):
+    """Find the end of whitespaces (other than line breaks) in a raw DNA
+    sequence.
+
+    Parameters
+    ----------
+    seq : np.array
+        DNA sequence as bytes (uint8).
+    tbl : np.array
+        Byte-to-base lookup table.
+    i : int
+        Start position.
+
+    Returns
+    -------
+    int
+        Position of the first line break or non-whitespace character, or
+        the end of the sequence.
+    """
+    n = seq.size
+    while i < n and tbl[seq[i]] == 254 and seq[i] != 10:
+        i += 1
+    return i
+
+
+def _count_length(seq, tbl):
+    """Count characters in a raw DNA sequence, excluding whitespaces that
+    are skipped by `_count_bytes`.
+    """
+    L, i, n = 0, 0, seq.size
+    while i < n:
+        if tbl[seq[i]] == 254:
+            j = space_end(seq, tbl, i)
+            if j == n or seq[j] == 10:
+                i = j + 1
+                continue
+            L += j - i
+            i = j
+        else:
+            L += 1
+            i += 1
+    return L
+
+
+def _count_batch(arr, starts, ends, tbl, k, minlen, res, lens):
+    """Count k-mers of multiple sequences in parallel.
+
+    Parameters
+    ----------
+    arr : np.array
+        Multi-FASTA file as bytes (uint8).
+    starts : np.array
+        Start positions of sequences.
+    ends : np.array
+        End positions of sequences.
+    tbl : np.array
+        Byte-to-base lookup table.
+    k : int
+        k-mer size.
+    minlen : int
+        Minimum length threshold.
+    res : np.array
+        k-mer frequencies per sequence to be incremented.
+    lens : np.array
+        Lengths of sequences to be filled.
+    """
+    for i in prange(starts.size):
+        seq = arr[starts[i]:ends[i]]
+        lens[i] = count_length(seq, tbl)
+        if lens[i] and lens[i] >= minlen:
+            count_bytes(seq, tbl, k, res[i])
+
+
+def _count_canonical_batch(arr, starts, ends, tbl, k, cidx, minlen, res,
+                           lens):
+    """Count canonical k-mers of multiple sequences in parallel.
+
+    See Also
+    --------
+    _count_batch
+    """
+    for i in prange(starts.size):
+        seq = arr[starts[i]:ends[i]]
+        lens[i] = count_length(seq, tbl)
+        if lens[i] and lens[i] >= minlen:
+            count_canonical(seq, tbl, k, cidx, res[i])
+
+
+# compiled k-mer counters (if Numba is available)
+if njit:
+    jit = njit(cache=True, boundscheck=False)
+    count_bytes = jit(_count_bytes)
+    count_canonical = jit(_count_canonical)
+    space_end = jit(_space_end)
+    count_length = jit(_count_length)
+    pjit = njit(cache=True, boundscheck=False, parallel=True)
+    count_batch = pjit(_count_batch)
+    count_canonical_batch = pjit(_count_canonical_batch)
+else:
+    count_bytes = count_canonical = None
 
 
 if __name__ == "__main__":
@@ -7,10 +7,19 @@ Usage:
 Notes:
     Following "-t" is the attribute tag to extract. Examples are "gene",
     "product", "eC_number", "locus_tag", etc.
+
+    Features are written out as soon as all lines of a sequence are read.
+    This assumes that lines of the same sequence are contiguous, which is
+    the case for typical annotation files (e.g., those generated by Prokka).
+    Otherwise, add flag "--unsorted", and features will be collected from the
+    entire file before being written.
 """
 
 import sys
 import argparse
+from collections import defaultdict
+from itertools import groupby
+from operator import itemgetter
 
 
 def parse_args():
@@ -25,6 +34,8 @@ def parse_args():
         help='attribute tag to extract')
     arg('-o', '--output', type=argparse.FileType('w'), default=sys.stdout,
         help='output mapping file, default: stdout')
+    arg('-u', '--unsorted', action='store_true',
+        help='lines of the same sequence are not contiguous')
     for arg in parser._actions:
         arg.metavar = ''
     if len(sys.argv) == 1:
@@ -37,9 +48,35 @@ def parse_args():
 def main():
     args = parse_args()
     out = args.output
-    tag = args.tag
-    res = {}
-    for line in args.input:
+    feats = extract_features(args.input, args.tag)
+    for seq, features in group_features(feats, args.unsorted):
+        print(seq, ','.join(features), sep='\t', file=out)
+
+
+def extract_features(fh, tag):
+    """Extract features from a GFF file.
+
+    Parameters
+    ----------
+    fh : file handle
+        Input GFF file.
+    tag : str
+        Attribute tag to extract.
+
+    Yields
+    ------
+    str
+        Sequence ID.
+    str
+        Feature.
+    """
+    key = tag + '='
+    needle = ';' + key
+    for line in fh:
+
+        # skip lines without the tag before splitting them
+        if key not in line:
+            continue
         line = line.rstrip('\r\n')
         if line.startswith('#'):
             continue
@@ -48,12 +85,47 @@ def main():
             attrs = row[8]
         except IndexError:
             continue
-        tags = dict(x.split('=') for x in attrs.split(';'))
-        if tag in tags:
-            res.setdefault(row[0], []).append(tags[tag])
-    for seq, features in res.items():
-        print(seq, ','.join(features), sep='\t', file=out)
 
+        # locate the tag without parsing all attributes
+        if attrs.startswith(key):
+            start = len(key)
+        else:
+            start = attrs.find(needle)
+            if start == -1:
+                continue
+            start += len(needle)
+        end = attrs.find(';', start)
+        yield row[0], attrs[start:] if end == -1 else attrs[start:end]
+
+
+
+def group_features(feats, unsorted=False):
+    """Group features by sequence.
+
+    Parameters
+    ----------
+    feats : iterable of (str, str)
+        Sequence IDs and features.
+    unsorted : bool, optional
+        Whether features of the same sequence may not be contiguous.
+
+    Returns
+    -------
+    iterable of (str, list of str)
+        Sequence IDs and their features.
+
+    Notes
+    -----
+    By default, each group is yielded as soon as its last feature is read.
+    If unsorted, all features are collected before being returned.
+    """
+    if unsorted:
+        res = defaultdict(list)
+        for seq, feature in feats:
+            res[seq].append(feature)
+        return res.items()
+    return ((seq, [x[1] for x in group]) for seq, group in groupby(
+        feats, key=itemgetter(0)))
 
 if __name__ == "__main__":
     main()
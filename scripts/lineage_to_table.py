@@ -50,15 +50,12 @@ def main():
         except ValueError:
             raise ValueError(f'Invalid contig-to-lineage match: {line}.')
         taxa = [x.strip() for x in lineage.split(';')]
-        datum = [ctg]
         for taxon in taxa:
             if taxon[1:3] != '__':
                 raise ValueError(f'Invalid taxon: {taxon}.')
-            code = taxon[0]
-            if code not in codes:
-                raise ValueError(f'Invalid rank code: {code}.')
-            datum.append(taxon[3:])
-        data.append(datum)
+            if taxon[0] not in codes:
+                raise ValueError(f'Invalid rank code: {taxon[0]}.')
+        data.append('\t'.join([ctg] + [x[3:] for x in taxa]))
         if len(taxa) == n:
             continue
         for i, taxon in enumerate(taxa):
@@ -71,10 +68,9 @@ def main():
                 ranks.append(code)
                 n += 1
     print('ID', '\t'.join([codes[x] for x in ranks]), sep='\t')
-    for datum in data:
-        if len(datum) < n:
-            datum.extend([''] * (n - len(datum)))
-        print('\t'.join(datum))
+    pads = ['\t' * i for i in range(n + 1)]
+    sys.stdout.writelines(
+        datum + pads[n - datum.count('\t')] + '\n' for datum in data)
 
 
 if __name__ == "__main__":
@@ -19,6 +19,7 @@ Notes:
 
 import sys
 import fileinput
+from collections import defaultdict
 
 
 def main():
@@ -26,20 +27,19 @@ def main():
         print(__doc__)
         sys.exit(1)
 
-    res = {}
+    res = defaultdict(list)
     for line in fileinput.input():
         line = line.rstrip('\r\n')
         try:
             orf, feature = line.split('\t')
         except ValueError:
             raise ValueError(f'Invalid ORF-to-feature map: {line}.')
-        try:
-            ctg, _ = orf.rsplit('_', 1)
-        except ValueError:
+        ctg, sep, _ = orf.rpartition('_')
+        if not sep:
             raise ValueError(f'Cannot extract contig ID from: {orf}.')
-        res.setdefault(ctg, []).append(feature)
-    for ctg, features in res.items():
-        print(ctg, ','.join(features), sep='\t')
+        res[ctg].append(feature)
+    sys.stdout.write(''.join(
+        f'{ctg}\t{",".join(features)}\n' for ctg, features in res.items()))
 
 
 if __name__ == "__main__":
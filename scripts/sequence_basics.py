@@ -5,6 +5,7 @@ Examples:
     python me.py -i input.fna -o output.tsv
     python me.py -i final.contigs.fa -a megahit -o output.tsv
     python me.py -i scaffolds.fasta -a spades --trim -o output.tsv
+    python me.py -i input.fna.gz -l 1000 -o output.tsv.gz
     zcat input.fna.gz | python me.py -l 1000 | gzip > output.tsv.gz
 
 Notes:
@@ -14,20 +15,44 @@ Notes:
     Coverage is taken from assembler-specific sequence titles (if applicable).
     However, note that these are not precise coverage values, and they are
     likely not identical to the results calculated from read mappings.
+
+    Input and output files with names ending with ".gz" are decompressed and
+    compressed on the fly.
+
+    If the Python library NumPy is available, GC contents of sequences will
+    be calculated in batches. In addition, with "--threads" more than one and
+    the Python library Numba available, sequences in each batch will be
+    processed in parallel by just-in-time compiled code.
 """
 
 import re
 import sys
+import gzip
 import argparse
 
+try:
+    import numpy as np
+except ModuleNotFoundError:
+    np = None
+
 
 # SPAdes sequence title
 # e.g. NODE_1_length_1000_cov_12.3
-spades = re.compile(r'^(NODE_\d+)_length_(\d+)_cov_(\d*\.?\d*)$')
+spades_match = re.compile(
+    r'^(NODE_\d+)_length_(\d+)_cov_(\d*\.?\d*)$', re.ASCII).match
 
 # MEGAHIT sequence title
 # e.g. k141_1 flag=1 multi=5.0000 len=1000
-megahit = re.compile(r'^(k\d+_\d+)\sflag=\d+\smulti=(\d*\.?\d*)\slen=(\d+)$')
+megahit_match = re.compile(
+    r'^(k\d+_\d+)\sflag=\d+\smulti=(\d*\.?\d*)\slen=(\d+)$', re.ASCII).match
+
+# GC weights of nucleotide codes (x6) in both cases, indexed by byte value
+# e.g. S (G or C) = 6, R (A or G) = 3, B (C, G or T) = 4
+gc_weights = dict.fromkeys(b'GCSgcs', 6)
+gc_weights.update(dict.fromkeys(b'RYKMNrykmn', 3))
+gc_weights.update(dict.fromkeys(b'DHdh', 2))
+gc_weights.update(dict.fromkeys(b'BVbv', 4))
+gc_table = bytes(gc_weights.get(i, 0) for i in range(256))
 
 
 def parse_args():
@@ -36,7 +61,7 @@ def parse_args():
     parser = argparse.ArgumentParser(
         formatter_class=argparse.RawDescriptionHelpFormatter)
     arg = parser.add_argument
-    arg('-i', '--input', type=argparse.FileType('r'), default=sys.stdin,
+    arg('-i', '--input', type=open_file, default=sys.stdin.buffer,
         help='input multi-FASTA file, default: stdin')
     arg('-l', '--minlen', type=int,
         help='minimum length threshold')
@@ -45,7 +70,10 @@ def parse_args():
         help='parse assembler-specific titles')
     arg('-t', '--trim', action='store_true',
         help='trim SPAdes titles into NODE_#')
-    arg('-o', '--output', type=argparse.FileType('w'), default=sys.stdout,
+    arg('-p', '--threads', type=int, default=1,
+        help='number of threads (requires Numba), default: 1')
+    arg('-o', '--output', type=lambda x: open_file(x, 'wb'),
+        default=sys.stdout.buffer,
         help='output table file, default: stdout')
     for arg in parser._actions:
         arg.metavar = ''
@@ -56,136 +84,427 @@ def parse_args():
     return parser.parse_args()
 
 
+def open_file(fname, mode='rb'):
+    """Open a file in binary mode, with gzip compression if applicable.
+
+    Parameters
+    ----------
+    fname : str
+        File name, or "-" for stdin / stdout.
+    mode : str, optional
+        "rb" for reading or "wb" for writing.
+
+    Returns
+    -------
+    file handle
+        Opened file.
+
+    Raises
+    ------
+    argparse.ArgumentTypeError
+        If the file cannot be opened.
+    """
+    if fname == '-':
+        return sys.stdin.buffer if 'r' in mode else sys.stdout.buffer
+    try:
+        if fname.endswith('.gz'):
+            return gzip.open(fname, mode)
+        return open(fname, mode)
+    except OSError as e:
+        raise argparse.ArgumentTypeError(f"can't open '{fname}': {e}")
+
+
 def main():
     args = parse_args()
     out = args.output
-    minlen = args.minlen
-    assem = args.assembler
-    trim = args.trim
     head = False
-    title = None
-    seq = ''
-
-    def parse_seq():
-        if not seq:
-            return
-        L = len(seq)
-        if minlen and L < minlen:
-            return
-        gc = '{:.2f}'.format(count_gc(seq) * 100 / L)
-        nonlocal title
-        nonlocal head
-        try:
-            name, cov = parse_title(title, assem, trim)
-        except ValueError as e:
-            exit(e)
-        if cov:
-            if not head:
-                print('ID', 'length', 'GC', 'coverage', sep='\t', file=out)
-                head = True
-            print(name, L, gc, cov, sep='\t', file=out)
-        else:
-            if not head:
-                print('ID', 'length', 'GC', sep='\t', file=out)
-                head = True
-            print(name, L, gc, sep='\t', file=out)
-
-    for line in args.input:
-        line = line.rstrip()
-        if line.startswith('>'):
-            parse_seq()
-            title, seq = line[1:], ''
-        else:
-            seq += line.upper()
-    parse_seq()
+    rows = []
+    records, size = [], 0
 
+    # empty sequences are skipped regardless of threshold
+    minlen = max(args.minlen or 1, 1)
+
+    # process sequences of each batch in parallel
+    parallel = args.threads > 1 and np is not None and load_numba(args.threads)
+
+    # records are processed in batches of up to 1024 or 16 MiB of sequences
+    parse_seqs = make_parser(args.assembler, rows, args.trim, parallel)
+    try:
+        for title, seq in read_fasta(args.input):
+            if len(seq) < minlen:
+                continue
+            records.append((title, seq))
+            size += len(seq)
+            if len(records) >= 1024 or size >= 1 << 24:
+                parse_seqs(records)
+                head = write_rows(rows, out, head)
+                records, size = [], 0
+        parse_seqs(records)
+    except ValueError as e:
+        exit(e)
+    finally:
+        write_rows(rows, out, head)
+        if out is not sys.stdout.buffer:
+            out.close()
 
-def count_gc(seq):
-    """Calculate frequency of G and C in a DNA sequence.
+
+def write_rows(rows, out, head=False):
+    """Write output rows and clear them.
 
     Parameters
     ----------
-    seq : str
-        DNA sequence.
+    rows : list of str
+        Output rows.
+    out : file handle
+        Output file opened in binary mode.
+    head : bool, optional
+        Whether the header has been written.
 
     Returns
     -------
-    float
-        GC frequency.
+    bool
+        Whether the header has been written.
 
     Notes
-    ----
-    Code degeneracy is considered.
+    -----
+    The header follows the first row (with or without coverage).
     """
-    res = 0
-    for c in seq.upper():
-        if c in 'GCS':
-            res += 6
-        elif c in 'RYKMN':
-            res += 3
-        elif c in 'DH':
-            res += 2
-        elif c in 'BV':
-            res += 4
-    return res / 6
-
-
-def parse_title(title, assem, trim=False):
-    """Extract information from a sequence title.
+    if rows and not head:
+        out.write(b'ID\tlength\tGC\tcoverage\n'
+                  if rows[0].count('\t') == 3 else b'ID\tlength\tGC\n')
+        head = True
+    out.write(''.join(rows).encode())
+    rows.clear()
+    return head
+
+
+def read_fasta(fh, size=1 << 20):
+    """Read sequences from a multi-FASTA file.
 
     Parameters
     ----------
-    title : str
+    fh : file handle
+        Input file opened in binary mode.
+    size : int, optional
+        Number of bytes to read at a time.
+
+    Yields
+    ------
+    str
         Sequence title.
+    bytes
+        Sequence (may be empty).
+
+    Notes
+    -----
+    Sequence lines before the first title (if any) are yielded with title
+    None.
+    """
+    title, lines = None, []
+    for chunk in read_lines(fh, size):
+        for line in chunk:
+            if line[:1] == b'>':
+                if title is not None or lines:
+                    yield title, b''.join(lines)
+                title, lines = line[1:].decode(), []
+            else:
+                lines.append(line)
+    if title is not None or lines:
+        yield title, b''.join(lines)
+
+
+def read_lines(fh, size=1 << 20):
+    """Read lines from a file in large chunks.
+
+    Parameters
+    ----------
+    fh : file handle
+        Input file opened in binary mode.
+    size : int, optional
+        Number of bytes to read at a time.
+
+    Yields
+    ------
+    list of bytes
+        Lines in a chunk, with trailing whitespaces stripped.
+
+    Notes
+    -----
+    Each chunk is split into lines at once, instead of reading the file line
+    by line. Lines are only stripped if the chunk has any whitespace other
+    than line breaks, which is not the case for many FASTA files.
+    """
+    tail = b''
+    while True:
+        chunk = fh.read(size)
+        if not chunk:
+            break
+        lines = chunk.split(b'\n')
+        lines[0] = tail + lines[0]
+        tail = lines.pop()
+        if (b' ' in chunk or b'\t' in chunk or b'\r' in chunk or
+                b'\x0b' in chunk or b'\x0c' in chunk):
+            lines = [x.rstrip() for x in lines]
+        elif lines:
+            lines[0] = lines[0].rstrip()
+        yield lines
+    if tail:
+        yield [tail.rstrip()]
+
+
+def make_parser(assem, rows, trim=False, parallel=False):
+    """Create a function that summarizes sequence records.
+
+    Parameters
+    ----------
     assem : str
         Assembler name.
+    rows : list
+        Output rows to be appended.
     trim : bool, optional
         Whether trim SPAdes metrics.
+    parallel : bool, optional
+        Whether calculate GC of sequences in parallel.
 
     Returns
     -------
-    str
-        Sequence name.
-    str
-        Sequence coverage (if applicable).
+    callable
+        Function that takes a list of sequence titles and sequences (not
+        empty), and appends rows of name, length, GC% and coverage (if
+        applicable).
 
-    Raises
-    ------
-    ValueError
-        If title format does not match designated assembler.
+    Notes
+    -----
+    The title parser and output format are bound once, so that the returned
+    function does not dispatch on them per record. GC frequencies of all
+    records are calculated at once before the rows are made.
     """
-    name, cov = None, None
+    parse = title_parsers[assem]
+    append = rows.append
+
+    # titles without coverage
     if assem == 'none':
-        name = title.split()[0]
-    elif assem == 'spades':
-        m = spades.match(title)
-        if m:
-            name = m.group(1) if trim else title
-            cov = m.group(3)
-        else:
-            raise ValueError(
-                f'{title} is not a valid SPAdes sequence title.')
-    elif assem == 'megahit':
-        m = megahit.match(title)
+        def parse_seqs(records):
+            gcs = count_gc_batch([x[1] for x in records], parallel)
+            for (title, seq), gc in zip(records, gcs):
+                L = len(seq)
+                append(f'{parse(title)[0]}\t{L}\t{gc * 100 / L:.2f}\n')
+        return parse_seqs
+
+    # titles with coverage (if matched)
+    def parse_seqs(records):
+        gcs = count_gc_batch([x[1] for x in records], parallel)
+        for (title, seq), gc in zip(records, gcs):
+            L = len(seq)
+            name, cov = parse(title, trim)
+            if cov:
+                append(f'{name}\t{L}\t{gc * 100 / L:.2f}\t{cov}\n')
+            else:
+                append(f'{name}\t{L}\t{gc * 100 / L:.2f}\n')
+    return parse_seqs
+
+
+def count_gc(seq):
+    """Calculate frequency of G and C in a DNA sequence.
+
+    Parameters
+    ----------
+    seq : bytes
+        DNA sequence.
+
+    Returns
+    -------
+    float
+        GC frequency.
+
+    Notes
+    ----
+    Code degeneracy is considered. Upper and lower cases are both fine.
+
+    Each character is translated into its GC weight by a lookup table in a
+    single pass, and the weights are summed, instead of looping over
+    characters in Python.
+    """
+    return sum(seq.translate(gc_table)) / 6
+
+
+def count_gc_batch(seqs, parallel=False):
+    """Calculate frequencies of G and C in multiple DNA sequences.
+
+    Parameters
+    ----------
+    seqs : list of bytes
+        DNA sequences (not empty).
+    parallel : bool, optional
+        Whether process sequences in parallel (requires `load_numba`).
+
+    Returns
+    -------
+    list of float
+        GC frequencies.
+
+    Notes
+    -----
+    Code degeneracy is considered. Upper and lower cases are both fine.
+
+    If NumPy is available, the sequences are concatenated once, and weights
+    of all sequences are summed by segment in one pass. In parallel mode,
+    sequences are instead processed by a compiled loop in multiple threads.
+    """
+    if np is None:
+        return [count_gc(x) for x in seqs]
+    if not seqs:
+        return []
+    arr = np.frombuffer(b''.join(seqs), dtype=np.uint8)
+    offs = np.zeros(len(seqs) + 1, dtype=np.int64)
+    np.cumsum([len(x) for x in seqs], out=offs[1:])
+    if parallel:
+        res = np.zeros(len(seqs), dtype=np.int64)
+        count_gc_parallel(arr, offs, gc_array, res)
+    else:
+        res = np.add.reduceat(gc_array[arr], offs[:-1], dtype=np.int64)
+    return (res / 6).tolist()
+
+
+def load_numba(threads):
+    """Compile the parallel GC counter with Numba.
+
+    Parameters
+    ----------
+    threads : int
+        Number of threads.
+
+    Returns
+    -------
+    bool
+        Whether Numba is available.
+
+    Notes
+    -----
+    Numba is only imported when parallel processing is requested, because
+    importing it takes longer than processing a typical input file.
+    """
+    global prange, count_gc_jit, count_gc_parallel
+    try:
+        from numba import njit, prange, config, set_num_threads
+    except ImportError:
+        return False
+    set_num_threads(min(threads, config.NUMBA_NUM_THREADS))
+    count_gc_jit = njit(cache=True, boundscheck=False)(_count_gc)
+    count_gc_parallel = njit(
+        cache=True, boundscheck=False, parallel=True)(_count_gc_parallel)
+    return True
+
+
+def _count_gc(seq, tbl):
+    """Sum GC weights of a DNA sequence.
+
+    Parameters
+    ----------
+    seq : np.array
+        DNA sequence as bytes (uint8).
+    tbl : np.array
+        Byte-to-weight lookup table.
+
+    Returns
+    -------
+    int
+        Sum of GC weights (x6).
+
+    Notes
+    -----
+    Four bases are looked up per iteration and summed into separate
+    accumulators, which breaks the dependency between consecutive additions
+    and lets the lookups run concurrently.
+    """
+    n = seq.size
+    m = n - n % 4
+    r0, r1, r2, r3 = 0, 0, 0, 0
+    for i in range(0, m, 4):
+        r0 += tbl[seq[i]]
+        r1 += tbl[seq[i + 1]]
+        r2 += tbl[seq[i + 2]]
+        r3 += tbl[seq[i + 3]]
+    for i in range(m, n):
+        r0 += tbl[seq[i]]
+    return r0 + r1 + r2 + r3
+
+
+def _count_gc_parallel(arr, offs, tbl, res):
+    """Sum GC weights of multiple DNA sequences in parallel.
+
+    Parameters
+    ----------
+    arr : np.array
+        Concatenated DNA sequences as bytes (uint8).
+    offs : np.array
+        Start positions of sequences, followed by the end position.
+    tbl : np.array
+        Byte-to-weight lookup table.
+    res : np.array
+        Sums of GC weights (x6) per sequence to be filled.
+    """
+    for i in prange(res.size):
+        res[i] = count_gc_jit(arr[offs[i]:offs[i + 1]], tbl)
+
+
+def parse_none(title, trim=False):
+    """Extract sequence name from a generic title.
+    """
+    return title.split(None, 1)[0], None
+
+
+def parse_spades(title, trim=False):
+    """Extract sequence name and coverage from a SPAdes title.
+    """
+    m = spades_match(title)
+    if not m:
+        raise ValueError(f'{title} is not a valid SPAdes sequence title.')
+    name, cov = m.group(1, 3)
+    return (name if trim else title), cov
+
+
+def parse_megahit(title, trim=False):
+    """Extract sequence name and coverage from a MEGAHIT title.
+    """
+    m = megahit_match(title)
+    if not m:
+        raise ValueError(f'{title} is not a valid MEGAHIT sequence title.')
+    return m.group(1, 2)
+
+
+def parse_auto(title, trim=False):
+    """Extract information from a SPAdes, MEGAHIT or generic title.
+
+    Notes
+    -----
+    A title is only matched against the pattern whose fixed prefix starts
+    with the same character ("N" for SPAdes, "k" for MEGAHIT).
+    """
+    c = title[:1]
+    if c == 'N':
+        m = spades_match(title)
         if m:
-            name = m.group(1)
-            cov = m.group(2)
-        else:
-            raise ValueError(
-                f'{title} is not a valid MEGAHIT sequence title.')
-    elif assem == 'auto':
-        m = spades.match(title)
+            name, cov = m.group(1, 3)
+            return (name if trim else title), cov
+    elif c == 'k':
+        m = megahit_match(title)
         if m:
-            name = m.group(1) if trim else title
-            cov = m.group(3)
-        else:
-            m = megahit.match(title)
-            if m:
-                name = m.group(1)
-                cov = m.group(2)
-            else:
-                name = title.split()[0]
-    return name, cov
+            return m.group(1, 2)
+    return title.split(None, 1)[0], None
+
+
+# title parsers per assembler
+title_parsers = {'auto': parse_auto, 'spades': parse_spades,
+                 'megahit': parse_megahit, 'none': parse_none}
+
+
+# GC weight lookup table as an array (if NumPy is available)
+if np is not None:
+    gc_array = np.frombuffer(gc_table, dtype=np.uint8)
+
+# compiled GC counters (set by `load_numba`)
+prange = count_gc_jit = count_gc_parallel = None
 
 
 if __name__ == "__main__":
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""Tests for scripts/count_kmers.py.
+
+Usage:
+    python -m unittest discover -s tests
+"""
+
+import sys
+import unittest
+import tempfile
+from io import BytesIO
+from os.path import join, dirname
+
+import numpy as np
+
+sys.path.insert(0, join(dirname(__file__), '..', 'scripts'))
+
+from count_kmers import (
+    list_kmers, count_kmers, canonical_kmers, build_table, read_fasta,
+    map_file, count_mapped, format_sparse, _count_bytes, _count_canonical, count_bytes,
+    count_canonical, njit)
+
+
+class Tests(unittest.TestCase):
+    def setUp(self):
+        self.chars = 'ACGT'
+        self.trans = build_table(self.chars).tobytes()
+
+    def test_list_kmers(self):
+        k = 2
+        n = len(self.chars) ** k
+        obs = list_kmers(self.chars, k, n)
+        exp = ['AA', 'AC', 'AG', 'AT',
+               'CA', 'CC', 'CG', 'CT',
+               'GA', 'GC', 'GG', 'GT',
+               'TA', 'TC', 'TG', 'TT']
+        self.assertListEqual(obs, exp)
+
+    def test_count_kmers(self):
+        trans = self.trans
+
+        k = 2
+        n = len(self.chars) ** k
+        obs = count_kmers(b'ACGT'.translate(trans), k, n)
+        exp = [0, 2, 0, 0,
+               0, 0, 2, 0,
+               0, 0, 0, 2,
+               0, 0, 0, 0]
+        self.assertListEqual(obs, exp)
+
+        obs = count_kmers(b'GCACTA'.translate(trans), k, n)
+        exp = [0, 1, 1, 0,
+               1, 0, 0, 1,
+               0, 2, 0, 1,
+               2, 0, 1, 0]
+        self.assertListEqual(obs, exp)
+
+        k = 3
+        n = len(self.chars) ** k
+        seq = b'CCAGCTGCGTAACCGAGAAACTACGTCT'
+        obs = count_kmers(seq.translate(trans), k, n)
+        exp = [1, 2, 0, 0, 0, 1, 3, 1, 2, 2, 0, 1, 0, 0, 0, 0,
+               0, 0, 2, 0, 1, 0, 1, 0, 1, 1, 1, 3, 1, 1, 2, 0,
+               1, 1, 1, 0, 1, 0, 1, 2, 0, 0, 0, 1, 2, 1, 0, 2,
+               1, 2, 1, 0, 0, 0, 1, 2, 0, 1, 1, 0, 1, 1, 0, 1]
+        self.assertListEqual(obs, exp)
+
+    def test_canonical_kmers(self):
+        k = 2
+        n = len(self.chars) ** k
+        keep, cidx, pals = canonical_kmers(k, n)
+        head = list_kmers(self.chars, k, n)
+        obs = [head[i] for i in keep]
+        exp = ['AA', 'AC', 'AG', 'AT', 'CA', 'CC', 'CG', 'GA', 'GC', 'TA']
+        self.assertListEqual(obs, exp)
+        obs = [obs[i] for i in cidx]
+        exp = ['AA', 'AC', 'AG', 'AT',
+               'CA', 'CC', 'CG', 'AG',
+               'GA', 'GC', 'CC', 'AC',
+               'TA', 'GA', 'CA', 'AA']
+        self.assertListEqual(obs, exp)
+        obs = [head[keep[i]] for i in pals]
+        self.assertListEqual(obs, ['AT', 'CG', 'GC', 'TA'])
+
+        k = 3
+        n = len(self.chars) ** k
+        keep, cidx, pals = canonical_kmers(k, n)
+        self.assertEqual(len(keep), 32)
+        self.assertEqual(len(pals), 0)
+
+    def test_count_canonical(self):
+        tbl = build_table(self.chars)
+        seq = 'CCAGCTGCGTAACCGAGAAACTNCGTCTacgtNNgcat'
+        arr = np.frombuffer(seq.encode(), dtype=np.uint8)
+        for k in (1, 2, 3, 4):
+            n = len(self.chars) ** k
+            keep, cidx, pals = canonical_kmers(k, n)
+            exp = count_kmers(seq.encode().translate(self.trans), k, n)
+            exp = [exp[i] for i in keep]
+            obs = np.zeros(len(keep), dtype=np.uint32)
+            _count_canonical(arr, tbl, k, cidx, obs)
+            obs[pals] *= 2
+            self.assertListEqual(obs.tolist(), exp)
+            if count_canonical is not None:
+                obs.fill(0)
+                count_canonical(arr, tbl, k, cidx, obs)
+                obs[pals] *= 2
+                self.assertListEqual(obs.tolist(), exp)
+
+    @unittest.skipIf(njit is None, 'requires Numba')
+    def test_count_mapped(self):
+        seqs = {b'': 'ACGTTGCA', b'a': 'CCAGCTGCGTAACCGAGAAACTNCGTCT',
+                b'b': 'GCACTA', b'c': 'AC', b'd': 'acgtNNgcatTTGGa'}
+        with tempfile.TemporaryFile() as f:
+            for name, seq in seqs.items():
+                if name:
+                    f.write(b'>' + name + b' x\r\n')
+                for i in range(0, len(seq), 5):
+                    f.write(seq[i:i + 5].encode() + b' \t'[i % 2:] + b'\n')
+            f.flush()
+            mm = map_file(f)
+            tbl = build_table(self.chars, skip=b' \t\r\n\x0b\x0c')
+            k = 3
+            n = len(self.chars) ** k
+            obs = {name: res.tolist() for name, res in count_mapped(
+                mm, tbl, k, n, minlen=3, batch=3)}
+        exp = {name: count_kmers(seq.encode().translate(self.trans), k, n)
+               for name, seq in seqs.items() if len(seq) >= 3}
+        self.assertDictEqual(obs, exp)
+
+        # whitespaces are only skipped at the end of a line, as by read_fasta
+        text = (b'>a\nACGTAC GTACGT\nAAAA\n>b y\r\n\tAC\x0cGT \r\nGG\t\n \n'
+                b'>c\nACG  T\r\n>d\nACGTACGTACGTACGTA \t')
+        with tempfile.TemporaryFile() as f:
+            f.write(text)
+            f.flush()
+            mm = map_file(f)
+            for minlen in (0, 17):
+                obs = {name: res.tolist() for name, res in count_mapped(
+                    mm, tbl, k, n, minlen=minlen)}
+                exp = {name: count_kmers(seq.translate(self.trans), k, n)
+                       for name, seq in read_fasta(BytesIO(text), 4)
+                       if len(seq) >= minlen}
+                self.assertDictEqual(obs, exp)
+
+    def test_count_bytes(self):
+        tbl = build_table(self.chars)
+        seq = 'CCAGCTGCGTAACCGAGAAACTNCGTCTacgtNNgcat'
+        arr = np.frombuffer(seq.encode(), dtype=np.uint8)
+        for k in (1, 2, 3, 4):
+            n = len(self.chars) ** k
+            exp = count_kmers(seq.encode().translate(self.trans), k, n)
+            obs = np.zeros(n, dtype=np.uint32)
+            _count_bytes(arr, tbl, k, obs)
+            self.assertListEqual(obs.tolist(), exp)
+            if count_bytes is not None:
+                obs.fill(0)
+                count_bytes(arr, tbl, k, obs)
+                self.assertListEqual(obs.tolist(), exp)
+
+    def test_format_sparse(self):
+        k = 2
+        n = len(self.chars) ** k
+        kmers = [x.encode() for x in list_kmers(self.chars, k, n)]
+        freqs = np.zeros(n, dtype=np.uint32)
+        self.assertIsNone(format_sparse(b'a', freqs, kmers))
+        freqs[[1, 6, 15]] = [3, 1, 2]
+        obs = format_sparse(b'a', freqs, kmers)
+        self.assertEqual(obs, b'a\tAC:3,CG,TT:2\n')
+
+        # canonical k-mers
+        keep, cidx, pals = canonical_kmers(k, n)
+        kmers = [kmers[i] for i in keep]
+        arr = np.frombuffer(b'ACGTT', dtype=np.uint8)
+        freqs = np.zeros(len(keep), dtype=np.uint32)
+        _count_canonical(arr, build_table(self.chars), k, cidx, freqs)
+        freqs[pals] *= 2
+        obs = format_sparse(b'b', freqs, kmers)
+        self.assertEqual(obs, b'b\tAA,AC:2,CG:2\n')
+
+
+if __name__ == "__main__":
+    unittest.main()
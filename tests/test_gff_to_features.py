@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""Tests for scripts/gff_to_features.py.
+
+Usage:
+    python -m unittest discover -s tests
+"""
+
+import sys
+import unittest
+from io import StringIO
+from os.path import join, dirname
+
+sys.path.insert(0, join(dirname(__file__), '..', 'scripts'))
+
+from gff_to_features import extract_features, group_features
+
+
+class Tests(unittest.TestCase):
+    def test_extract_features(self):
+        gff = StringIO(
+            '##gff-version 3\n'
+            '#c1\t.\tCDS\t1\t9\t.\t+\t0\tgene=x\n'
+            'c1\tProdigal\tCDS\t1\t9\t.\t+\t0\tgene=a;product=p1\n'
+            'c1\tProdigal\tCDS\t1\t9\t.\t+\t0\tID=2;gene=b\r\n'
+            'c1\tProdigal\tCDS\t1\t9\t.\t+\t0\tID=3;gene=c;\n'
+            'c2\tProdigal\tCDS\t1\t9\t.\t+\t0\tNote=gene=x;gene=d\n'
+            'c2\tProdigal\tCDS\t1\t9\t.\t+\t0\tNote=gene=x\n'
+            'c2\tProdigal\tCDS\t1\t9\t.\t+\t0\tID=6;genes=x;mygene=x\n'
+            'c2\tProdigal\tCDS\t1\t9\t.\t+\t0\tID=7;product=p7\n'
+            'c2\tgene=x\tCDS\t1\t9\t.\t+\t0\tID=8;product=p8\n'
+            'c2\tgene=x\n'
+            'c3\tProdigal\tCDS\t1\t9\t.\t+\t0\tgene=e\n')
+        obs = list(extract_features(gff, 'gene'))
+        exp = [('c1', 'a'), ('c1', 'b'), ('c1', 'c'), ('c2', 'd'),
+               ('c3', 'e')]
+        self.assertListEqual(obs, exp)
+
+    def test_group_features(self):
+        feats = [('c1', 'a'), ('c1', 'b'), ('c2', 'c'), ('c1', 'd')]
+        obs = list(group_features(iter(feats)))
+        exp = [('c1', ['a', 'b']), ('c2', ['c']), ('c1', ['d'])]
+        self.assertListEqual(obs, exp)
+        obs = list(group_features(iter(feats), unsorted=True))
+        exp = [('c1', ['a', 'b', 'd']), ('c2', ['c'])]
+        self.assertListEqual(obs, exp)
+        self.assertListEqual(list(group_features(iter([]))), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""Tests for scripts/lineage_to_table.py.
+
+Usage:
+    python -m unittest discover -s tests
+"""
+
+import sys
+import unittest
+import tempfile
+from io import StringIO
+from os.path import join, dirname
+from contextlib import redirect_stdout
+from unittest.mock import patch
+
+sys.path.insert(0, join(dirname(__file__), '..', 'scripts'))
+
+from lineage_to_table import main
+
+
+class Tests(unittest.TestCase):
+    def test_main(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            fname = join(tmp, 'lineage.map')
+            with open(fname, 'w') as f:
+                f.write('c1\td__Archaea\n'
+                        'c2\td__Bacteria; p__Proteobacteria; '
+                        'c__Gammaproteobacteria\n'
+                        'c3\td__Bacteria; p__Firmicutes\r\n')
+            out = StringIO()
+            with patch.object(sys, 'argv', ['me.py', fname]), \
+                    redirect_stdout(out):
+                main()
+        obs = out.getvalue().splitlines()
+        exp = ['ID\tdomain\tphylum\tclass',
+               'c1\tArchaea\t\t',
+               'c2\tBacteria\tProteobacteria\tGammaproteobacteria',
+               'c3\tBacteria\tFirmicutes\t']
+        self.assertListEqual(obs, exp)
+
+        # short lineages are padded to the width of the header
+        for row in obs[1:]:
+            self.assertEqual(row.count('\t'), obs[0].count('\t'))
+
+
+if __name__ == "__main__":
+    unittest.main()
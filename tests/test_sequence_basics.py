@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""Tests for scripts/sequence_basics.py.
+
+Usage:
+    python -m unittest discover -s tests
+"""
+
+import sys
+import unittest
+from io import BytesIO
+from os.path import join, dirname
+
+sys.path.insert(0, join(dirname(__file__), '..', 'scripts'))
+
+import sequence_basics
+from sequence_basics import (
+    write_rows, read_fasta, read_lines, count_gc, count_gc_batch, load_numba,
+    parse_auto)
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+class Tests(unittest.TestCase):
+    def setUp(self):
+        self.seqs = [b'ACGT', b'acgtNNgcat', b'GGCCSSwwNN', b'RYKMrykm',
+                     b'BDHVbdhvN', b'AAAAttttn', b'G', b'c' * 300,
+                     b'CCAGCTGCGTAACCGAGAAACTNCGTCTacgtNNgcatRYS' * 10]
+
+    def test_read_lines(self):
+        text = b'>a x\r\nACG \t\r\nTT\n\n>b\nGG\x0c\nCC'
+        exp = [b'>a x', b'ACG', b'TT', b'', b'>b', b'GG', b'CC']
+        for size in (1, 2, 3, 5, 7, 1 << 20):
+            obs = [x for chunk in read_lines(BytesIO(text), size)
+                   for x in chunk]
+            self.assertListEqual(obs, exp)
+
+        # chunks without whitespaces other than line breaks
+        text = b'>a\nACGT\nAC\n>b\nGGCC\n'
+        exp = [b'>a', b'ACGT', b'AC', b'>b', b'GGCC']
+        for size in (1, 3, 4, 1 << 20):
+            obs = [x for chunk in read_lines(BytesIO(text), size)
+                   for x in chunk]
+            self.assertListEqual(obs, exp)
+
+    def test_read_fasta(self):
+        text = (b'ac\r\ngt \n>a x\r\nACG \t\r\nTT\r\n>b\n>c\tyy\n'
+                b'GG\nCC  \n\n')
+        exp = [(None, b'acgt'), ('a x', b'ACGTT'), ('b', b''),
+               ('c\tyy', b'GGCC')]
+        for size in (1, 2, 3, 5, 8, 1 << 20):
+            obs = list(read_fasta(BytesIO(text), size))
+            self.assertListEqual(obs, exp)
+        self.assertListEqual(list(read_fasta(BytesIO(b''))), [])
+
+    def test_count_gc(self):
+        exp = [2, 5, 7, 4, 4.5, 0.5, 1, 300, 225]
+        for seq, e in zip(self.seqs, exp):
+            self.assertAlmostEqual(count_gc(seq), e)
+
+    def test_count_gc_batch(self):
+        for seqs in (self.seqs, self.seqs[:1], []):
+            exp = [count_gc(x) for x in seqs]
+
+            # NumPy
+            obs = count_gc_batch(seqs)
+            for o, e in zip(obs, exp):
+                self.assertAlmostEqual(o, e)
+            self.assertEqual(len(obs), len(exp))
+
+            # pure Python
+            np, sequence_basics.np = sequence_basics.np, None
+            try:
+                obs = count_gc_batch(seqs, parallel=True)
+            finally:
+                sequence_basics.np = np
+            self.assertListEqual(obs, exp)
+
+    @unittest.skipIf(numba is None, 'requires Numba')
+    def test_count_gc_parallel(self):
+        self.assertTrue(load_numba(2))
+        for seqs in (self.seqs, self.seqs[:1], []):
+            exp = [count_gc(x) for x in seqs]
+            obs = count_gc_batch(seqs, parallel=True)
+            for o, e in zip(obs, exp):
+                self.assertAlmostEqual(o, e)
+            self.assertEqual(len(obs), len(exp))
+
+    def test_parse_auto(self):
+        # SPAdes
+        title = 'NODE_12_length_3456_cov_7.89'
+        self.assertTupleEqual(parse_auto(title), (title, '7.89'))
+        self.assertTupleEqual(parse_auto(title, trim=True),
+                              ('NODE_12', '7.89'))
+
+        # MEGAHIT
+        title = 'k141_25 flag=1 multi=3.0000 len=402'
+        obs = parse_auto(title)
+        self.assertTupleEqual(obs, ('k141_25', '3.0000'))
+        self.assertTupleEqual(parse_auto(title, trim=True), obs)
+
+        # generic
+        for title, name in (('contig1 some description', 'contig1'),
+                            ('NODE_1 length 100', 'NODE_1'),
+                            ('k141_25\tflag=1', 'k141_25'),
+                            ('Nk', 'Nk'), ('k', 'k')):
+            self.assertTupleEqual(parse_auto(title), (name, None))
+            self.assertTupleEqual(parse_auto(title, trim=True), (name, None))
+
+    def test_write_rows(self):
+        # without coverage
+        out = BytesIO()
+        rows = ['a\t4\t50.00\n', 'b\t2\t0.00\n']
+        head = write_rows(rows, out)
+        self.assertTrue(head)
+        self.assertListEqual(rows, [])
+        rows.append('c\t3\t100.00\n')
+        self.assertTrue(write_rows(rows, out, head))
+        self.assertEqual(out.getvalue(), (
+            b'ID\tlength\tGC\n'
+            b'a\t4\t50.00\nb\t2\t0.00\nc\t3\t100.00\n'))
+
+        # with coverage
+        out = BytesIO()
+        rows = ['a\t4\t50.00\t1.5\n']
+        self.assertTrue(write_rows(rows, out))
+        self.assertEqual(out.getvalue(), (
+            b'ID\tlength\tGC\tcoverage\na\t4\t50.00\t1.5\n'))
+
+        # no rows yet
+        out = BytesIO()
+        self.assertFalse(write_rows([], out))
+        self.assertEqual(out.getvalue(), b'')
+
+
+if __name__ == "__main__":
+    unittest.main()